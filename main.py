@@ -15,12 +15,8 @@ from dotenv import load_dotenv
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-# Import our modules with correct paths
-from src.sheets_reader import SheetsReader
-from src.content_processor import ContentProcessor  
-from src.style_manager import BusinessStyleManager
-from src.pdf_generator import BusinessPDFGenerator
-from src.pdf_merger import BusinessPDFMerger
+# Import our modules with correct paths. Spawned render workers re-run this
+# module's top level, so the Sheets client and merger are imported in main()
 from src.thread_manager import ThreadManager, process_single_sheet
 
 def setup_logging(verbose=False):
@@ -45,7 +41,8 @@ def load_config():
         'spreadsheet_id': os.getenv('SPREADSHEET_ID'),
         'credentials_path': os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'config/credentials.json'),
         'output_dir': os.getenv('OUTPUT_DIR', 'output'),
-        'max_threads': int(os.getenv('MAX_THREADS', '4'))
+        'max_threads': int(os.getenv('MAX_THREADS', '4')),
+        'io_workers': int(os.getenv('SHEETS_IO_CONCURRENCY', '16'))
     }
     
     return config
@@ -117,7 +114,7 @@ Examples:
         '--threads',
         type=int,
         default=None,
-        help='Number of processing threads (default: auto)'
+        help='Number of PDF rendering processes (default: auto)'
     )
     
     parser.add_argument(
@@ -159,12 +156,15 @@ Examples:
         # Initialize components
         logger.info("🔧 Initializing components...")
         
+        from src.sheets_reader import SheetsReader
+        from src.pdf_merger import BusinessPDFMerger
+        
         sheets_reader = SheetsReader(config['credentials_path'])
-        content_processor = ContentProcessor()
-        style_manager = BusinessStyleManager()
-        pdf_generator = BusinessPDFGenerator(style_manager, output_dir=os.path.join(config['output_dir'], 'temp'))
         pdf_merger = BusinessPDFMerger(output_dir=os.path.join(config['output_dir'], 'final'))
-        thread_manager = ThreadManager(max_workers=config['max_threads'])
+        thread_manager = ThreadManager(
+            max_workers=config['io_workers'],
+            cpu_workers=config['max_threads']
+        )
         
         # Get spreadsheet information
         logger.info(f"📊 Reading spreadsheet: {config['spreadsheet_id']}")
@@ -192,16 +192,26 @@ Examples:
             estimate = thread_manager.estimate_processing_time(len(sheets_to_process), avg_time_per_sheet=8)
             logger.info(f"⏱️ Estimated time: {estimate['estimate_seconds']}s ({estimate['parallel_speedup']}x speedup)")
         
-        # Process sheets in parallel
-        logger.info("🚀 Starting multi-threaded processing...")
+        # Fetch Column D of every sheet in a single batchGet round trip
+        sheet_contents = sheets_reader.batch_get_columns(config['spreadsheet_id'], sheets_to_process)
+        
+        # Sheets the batch call did not return are read one by one on threads
+        unread_sheets = [s for s in sheets_to_process if s not in sheet_contents]
+        if unread_sheets:
+            logger.info(f"📖 Reading {len(unread_sheets)} sheets individually...")
+            sheet_contents.update(thread_manager.process_sheets_parallel(
+                unread_sheets,
+                lambda sheet_name: sheets_reader.read_column_d(config['spreadsheet_id'], sheet_name),
+                deadline_seconds=300
+            ))
+        
+        # Process sheets in parallel (each sheet is built in a worker process)
+        logger.info("🚀 Starting parallel processing...")
         
-        results = thread_manager.process_sheets_parallel(
-            sheets_to_process,
+        results = thread_manager.process_sheets_cpu_parallel(
+            sheet_contents,
             process_single_sheet,
-            config['spreadsheet_id'],
-            sheets_reader,
-            content_processor,
-            pdf_generator
+            os.path.join(config['output_dir'], 'temp')
         )
         
         # Check results
@@ -1,17 +1,32 @@
 # Vietnamese PDF Ebook Generator Source Package
-from .sheets_reader import SheetsReader
-from .content_processor import ContentProcessor
-from .style_manager import BusinessStyleManager
-from .pdf_generator import BusinessPDFGenerator
-from .pdf_merger import BusinessPDFMerger
-from .thread_manager import ThreadManager, process_single_sheet
+import importlib
+
+# Submodules are imported on first use, so rendering worker processes do
+# not load the Sheets API client or pypdf just to import the package
+_EXPORTS = {
+    'SheetsReader': 'sheets_reader',
+    'ContentProcessor': 'content_processor',
+    'BusinessStyleManager': 'style_manager',
+    'BusinessPDFGenerator': 'pdf_generator',
+    'BusinessPDFMerger': 'pdf_merger',
+    'ThreadManager': 'thread_manager',
+    'process_single_sheet': 'thread_manager',
+}
 
 __all__ = [
     'SheetsReader',
     'ContentProcessor',
-    'BusinessStyleManager', 
+    'BusinessStyleManager',
     'BusinessPDFGenerator',
     'BusinessPDFMerger',
     'ThreadManager',
     'process_single_sheet'
 ]
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -5,10 +5,75 @@ Content Processor
 Xử lý nội dung từ Google Sheets - CHỈ format, KHÔNG thêm content
 """
 
+import functools
 import re
 import unicodedata
 import logging
 
+# Single-character replacements, applied in one str.translate pass
+_CHAR_TRANS = str.maketrans({
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+    '–': '—',
+})
+
+# Multi-character replacements ('...' and runs of spaces), applied in one regex pass
+_MULTI_RE = re.compile(r'\.\.\.| {2,}')
+
+def _replace_multi(match):
+    return '…' if match.group() == '...' else ' '
+
+# Opening marks of a dialog line (straight/curly quote or em dash)
+_DIALOG_PREFIXES = ('"', '\u201c', '—')
+
+# NFC lengthens a string by at most this factor (UAX #15); the replacements
+# and the final strip never make it longer
+_MAX_NFC_EXPANSION = 3
+
+# Keywords that mark a short line as a header
+_HEADER_RE = re.compile('chương|phần|mục')
+
+def _normalize(text):
+    """NFC-normalize text and apply the character replacements"""
+    text = unicodedata.normalize('NFC', text).translate(_CHAR_TRANS)
+    return _MULTI_RE.sub(_replace_multi, text).strip()
+
+def _classify(text):
+    """Classify already stripped text as 'dialog', 'header' or 'paragraph'"""
+    if text.startswith(_DIALOG_PREFIXES):
+        return 'dialog'
+    
+    # Headers are short, so long text skips the case and keyword scans
+    if len(text) >= 100:
+        return 'paragraph'
+    
+    if text.isupper() or _HEADER_RE.search(text.lower()):
+        return 'header'
+    
+    return 'paragraph'
+
+@functools.lru_cache(maxsize=4096)
+def _scan_and_clean(raw_text, min_length):
+    """Clean and classify one raw row in a single call
+    
+    Returns (type, cleaned) or None when the row is too short to keep.
+    """
+    # Only NFC can lengthen a row (e.g. U+0958 decomposes to 2 code points),
+    # so a short row is dropped up front only when ASCII or too short to
+    # reach min_length even after the maximal NFC expansion
+    if len(raw_text) < min_length and (
+        raw_text.isascii() or len(raw_text) * _MAX_NFC_EXPANSION < min_length
+    ):
+        return None
+    
+    cleaned = _normalize(raw_text)
+    if len(cleaned) < min_length:
+        return None
+    
+    return _classify(cleaned), cleaned
+
 class ContentProcessor:
     """Process raw content from Google Sheets Column D"""
     
@@ -21,41 +86,14 @@ class ContentProcessor:
         if not text:
             return ""
         
-        text = unicodedata.normalize('NFC', text)
-        
-        replacements = {
-            '"': '"',
-            '"': '"',
-            ''': "'",
-            ''': "'",
-            '–': '—',
-            '...': '…',
-            '  ': ' ',
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        
-        return text.strip()
+        return _normalize(text)
     
     def detect_content_type(self, text):
         """Detect content type WITHOUT changing content"""
         if not text:
             return 'empty'
         
-        text_clean = text.strip()
-        
-        if ('"' in text_clean or 
-            text_clean.startswith('"') or 
-            text_clean.startswith('—')):
-            return 'dialog'
-        
-        if len(text_clean) < 100:
-            if (text_clean.isupper() or 
-                any(keyword in text_clean.lower() for keyword in ['chương', 'phần', 'mục'])):
-                return 'header'
-        
-        return 'paragraph'
+        return _classify(text.strip())
     
     def process_sheet_content(self, raw_content_list):
         """Process raw content from Google Sheets Column D"""
@@ -63,29 +101,25 @@ class ContentProcessor:
             self.logger.warning("⚠️ No content to process")
             return []
         
-        processed_blocks = []
+        min_length = self.paragraph_min_length
+        
+        scanned_rows = (
+            (i, _scan_and_clean(raw_text, min_length))
+            for i, raw_text in enumerate(raw_content_list)
+            if raw_text
+        )
         
-        for i, raw_text in enumerate(raw_content_list):
-            if not raw_text or not raw_text.strip():
-                continue
-            
-            cleaned_text = self.clean_vietnamese_text(raw_text)
-            
-            if len(cleaned_text) < self.paragraph_min_length:
-                continue
-            
-            content_type = self.detect_content_type(cleaned_text)
-            
-            block = {
-                'type': content_type,
-                'content': cleaned_text,
-                'original_index': i,
-                'original_length': len(raw_text)
+        processed_blocks = [
+            {
+                'type': scanned[0],
+                'content': scanned[1],
+                'original_index': i
             }
-            
-            processed_blocks.append(block)
+            for i, scanned in scanned_rows
+            if scanned
+        ]
         
-        self.logger.info(f"📝 Processed {len(processed_blocks)} content blocks")
+        self.logger.info("📝 Processed %d content blocks", len(processed_blocks))
         return processed_blocks
 
 if __name__ == '__main__':
@@ -7,34 +7,52 @@ Generate professional business-style PDFs from processed content
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.pdfgen import canvas
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph
+import functools
 import os
 import logging
-import re
 
-class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
+# Characters that are not allowed in Windows filenames
+_FILENAME_TRANS = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
 
-    def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
+# Sheet names containing one of these are rendered as a chapter heading
+_CHAPTER_KEYWORDS = ('chương', 'chapter', 'phần')
 
-    def save(self):
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self.draw_page_number()
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
+# Page geometry is fixed (A4), so margins are computed once at import
+_LEFT_MARGIN = _RIGHT_MARGIN = _BOTTOM_MARGIN = 0.8 * inch
+_TOP_MARGIN = 0.9 * inch
+_PAGE_NUMBER_Y = 0.6 * inch
 
-    def draw_page_number(self):
-        self.saveState()
-        self.setFont("Helvetica", 9)
-        page_num = f"{self._pageNumber}"
-        self.drawCentredString(A4[0] / 2, 0.6 * inch, page_num)
-        self.restoreState()
+_DOC_KW = dict(
+    pagesize=A4,
+    rightMargin=_RIGHT_MARGIN,
+    leftMargin=_LEFT_MARGIN,
+    topMargin=_TOP_MARGIN,
+    bottomMargin=_BOTTOM_MARGIN
+)
+
+@functools.lru_cache(maxsize=2048)
+def _parse_paragraph(text, style):
+    """Parse paragraph markup once per (text, style)
+    
+    Returns (style, frags, bulletText). Only the parse result is cached:
+    Paragraph objects pick up layout state during a build, so a fresh one
+    is created from these parts every time.
+    """
+    para = Paragraph(text, style)
+    return para.style, para.frags, para.bulletText
+
+def _make_paragraph(text, style):
+    """Create a Paragraph, reusing the parsed fragments of repeated text"""
+    parsed_style, frags, bullet_text = _parse_paragraph(text, style)
+    return Paragraph(text, parsed_style, bulletText=bullet_text, frags=frags)
+
+def _draw_page_number(canv, doc):
+    """Draw the page number centred in the bottom margin"""
+    canv.saveState()
+    canv.setFont("Helvetica", 9)
+    canv.drawCentredString(A4[0] / 2, _PAGE_NUMBER_Y, str(canv.getPageNumber()))
+    canv.restoreState()
 
 class BusinessPDFGenerator:
     """Generate professional business-style PDFs"""
@@ -44,37 +62,49 @@ class BusinessPDFGenerator:
         self.output_dir = output_dir
         self.logger = logging.getLogger(__name__)
         os.makedirs(output_dir, exist_ok=True)
+        
+        # Single body frame inside the page margins, built once and reused for
+        # every sheet (ReportLab resets frame state at the start of each page)
+        body_frame = Frame(
+            _LEFT_MARGIN,
+            _BOTTOM_MARGIN,
+            A4[0] - _LEFT_MARGIN - _RIGHT_MARGIN,
+            A4[1] - _TOP_MARGIN - _BOTTOM_MARGIN,
+            id='body'
+        )
+        self._page_template = PageTemplate(id='main', frames=[body_frame], onPageEnd=_draw_page_number)
+        
+        # Styles are read-only once created, so resolve them once up front
+        self._style_chapter = style_manager.get_style('BusinessChapter')
+        self._style_body = style_manager.get_style('BusinessBody')
+        self._style_dialog = style_manager.get_style('BusinessDialog')
     
     def generate_sheet_pdf(self, sheet_name, content_blocks, metadata=None):
         """Generate PDF for a single sheet"""
+        # Only blocks with visible text produce output; without any, skip the
+        # build instead of writing a PDF that holds nothing but page numbers
+        content_blocks = [block for block in content_blocks or [] if block['content'].strip()]
         if not content_blocks:
-            self.logger.warning(f"⚠️ No content blocks for {sheet_name}")
+            self.logger.warning("⚠️ No content blocks for %s", sheet_name)
             return None
         
         safe_filename = self._sanitize_filename(sheet_name)
         output_path = os.path.join(self.output_dir, f"{safe_filename}.pdf")
         
-        self.logger.info(f"📄 Generating PDF: {sheet_name}")
+        self.logger.info("📄 Generating PDF: %s", sheet_name)
         
         try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                rightMargin=0.8*inch,
-                leftMargin=0.8*inch,
-                topMargin=0.9*inch,
-                bottomMargin=0.8*inch,
-                title=sheet_name
-            )
+            doc = BaseDocTemplate(output_path, title=sheet_name, **_DOC_KW)
+            doc.addPageTemplates([self._page_template])
             
             story = self._build_story(sheet_name, content_blocks)
-            doc.build(story, canvasmaker=NumberedCanvas)
+            doc.build(story)
             
-            self.logger.info(f"✅ PDF generated: {output_path}")
+            self.logger.info("✅ PDF generated: %s", output_path)
             return output_path
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to generate PDF for {sheet_name}: {e}")
+            self.logger.error("❌ Failed to generate PDF for %s: %s", sheet_name, e)
             return None
     
     def _build_story(self, sheet_name, content_blocks):
@@ -82,25 +112,23 @@ class BusinessPDFGenerator:
         story = []
         
         if self._is_chapter_title(sheet_name):
-            title_para = Paragraph(sheet_name, self.style_manager.get_style('BusinessChapter'))
+            title_para = Paragraph(sheet_name, self._style_chapter)
             story.append(title_para)
-            story.append(Spacer(1, 0.2*inch))
+        
+        style_body = self._style_body
+        style_dialog = self._style_dialog
         
         for block in content_blocks:
-            if not block['content'].strip():
-                continue
-            
             content = block['content']
             content_type = block['type']
             
             if content_type == 'dialog':
-                style = self.style_manager.get_style('BusinessDialog')
+                style = style_dialog
             else:
-                style = self.style_manager.get_style('BusinessBody')
+                style = style_body
             
-            para = Paragraph(content, style)
+            para = _make_paragraph(content, style)
             story.append(para)
-            story.append(Spacer(1, 0.05*inch))
         
         return story
     
@@ -108,12 +136,12 @@ class BusinessPDFGenerator:
         """Check if text looks like a chapter title"""
         if not text:
             return False
-        return any(keyword in text.lower() for keyword in ['chương', 'chapter', 'phần'])
+        lowered = text.lower()
+        return any(keyword in lowered for keyword in _CHAPTER_KEYWORDS)
     
     def _sanitize_filename(self, filename):
         """Sanitize filename for filesystem"""
-        safe_name = re.sub(r'[<>:"/\\|?*]', '_', filename)
-        return safe_name[:50] if len(safe_name) > 50 else safe_name
+        return filename.translate(_FILENAME_TRANS)[:50]
 
 if __name__ == '__main__':
     print("🧪 Testing PDF Generator...")
@@ -5,9 +5,31 @@ PDF Merger - FIXED VERSION
 Combine multiple sheet PDFs into final ebook
 """
 
-from PyPDF2 import PdfMerger
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 import logging
+import shutil
+import subprocess
+
+# Sheet PDFs are read and parsed ahead of the writer by this many threads,
+# with at most twice as many parsed readers held in memory at once
+_PREFETCH_WORKERS = 4
+_PREFETCH_WINDOW = 2 * _PREFETCH_WORKERS
+
+# pypdf writes the ebook object by object, so small writes are coalesced
+# into a large buffer before they reach the file
+_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# qpdf is killed after this many seconds and the merge falls back to pypdf
+_QPDF_TIMEOUT = 300
+
+def _load_reader(pdf_file):
+    """Read and parse one sheet PDF, returning (reader, page_count)"""
+    from pypdf import PdfReader
+    
+    reader = PdfReader(pdf_file)
+    return reader, len(reader.pages)
 
 class BusinessPDFMerger:
     """Merge multiple PDFs into final business ebook"""
@@ -16,9 +38,20 @@ class BusinessPDFMerger:
         self.output_dir = output_dir
         self.logger = logging.getLogger(__name__)
         os.makedirs(output_dir, exist_ok=True)
+        
+        # Page totals of ebooks merged by this instance, so stats do not
+        # have to parse the finished ebook again
+        self._page_counts = {}
     
     def merge_sheets_to_ebook(self, pdf_files, output_filename, add_bookmarks=True, metadata=None):
-        """Merge multiple sheet PDFs into final ebook"""
+        """Merge multiple sheet PDFs into final ebook
+        
+        Only pages are copied from each sheet PDF; their outlines, forms and
+        named destinations are never walked. With add_bookmarks=False no
+        outline is built at all, and the files are concatenated by the qpdf
+        CLI instead of pypdf when it is installed. A single sheet without
+        bookmarks is copied byte for byte.
+        """
         if not pdf_files:
             self.logger.error("❌ No PDF files to merge")
             return None
@@ -30,27 +63,48 @@ class BusinessPDFMerger:
             return None
         
         output_path = os.path.join(self.output_dir, output_filename)
+        self._page_counts.pop(output_path, None)
         self.logger.info(f"📚 Merging {len(existing_files)} PDFs into ebook")
         
+        # Without bookmarks a single sheet PDF already is the ebook; metadata
+        # is not written by any merge path, so it needs no rewrite either
+        if len(existing_files) == 1 and not add_bookmarks and self._copy_single_file(existing_files[0], output_path):
+            self.logger.info(f"✅ Ebook created: {output_path}")
+            return output_path
+        
+        # qpdf copies objects natively and much faster, but cannot add the
+        # chapter outline, so it is only used for merges without bookmarks
+        if not add_bookmarks and self._merge_with_qpdf(existing_files, output_path):
+            self.logger.info(f"✅ Ebook created: {output_path}")
+            return output_path
+        
         try:
-            merger = PdfMerger()
+            # pypdf is only needed once rendering has finished
+            from pypdf import PdfWriter
+            
+            writer = PdfWriter()
             
-            for pdf_file in existing_files:
-                chapter_name = self._extract_chapter_name(pdf_file)
+            # Parsing the next files overlaps with appending the current one;
+            # pages are still appended strictly in the given order
+            page_offset = 0
+            with ThreadPoolExecutor(max_workers=_PREFETCH_WORKERS) as executor:
+                pending = deque()
+                for pdf_file in existing_files:
+                    pending.append((pdf_file, executor.submit(_load_reader, pdf_file)))
+                    if len(pending) >= _PREFETCH_WINDOW:
+                        page_offset += self._append_sheet(writer, *pending.popleft(), add_bookmarks, page_offset)
                 
-                if add_bookmarks:
-                    # FIXED: Use outline_item instead of deprecated bookmark
-                    try:
-                        merger.append(pdf_file, outline_item=chapter_name)
-                    except TypeError:
-                        # Fallback for older PyPDF2 versions
-                        merger.append(pdf_file, bookmark=chapter_name)
-                else:
-                    merger.append(pdf_file)
-                self.logger.info(f"📄 Added: {chapter_name}")
+                while pending:
+                    page_offset += self._append_sheet(writer, *pending.popleft(), add_bookmarks, page_offset)
             
-            merger.write(output_path)
-            merger.close()
+            if not page_offset:
+                self.logger.error("❌ No readable PDF files to merge")
+                return None
+            
+            with open(output_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as output_file:
+                writer.write(output_file)
+            writer.close()
+            self._page_counts[output_path] = page_offset
             
             self.logger.info(f"✅ Ebook created: {output_path}")
             return output_path
@@ -59,6 +113,68 @@ class BusinessPDFMerger:
             self.logger.error(f"❌ Failed to merge PDFs: {e}")
             return None
     
+    def _copy_single_file(self, pdf_file, output_path):
+        """Copy one PDF to the output path unchanged, return success"""
+        try:
+            # copyfile uses os.sendfile / fcopyfile where the OS supports it
+            shutil.copyfile(pdf_file, output_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Copying {pdf_file} failed, merging with pypdf: {e}")
+            return False
+        
+        self.logger.info(f"📄 Copied single PDF: {self._extract_chapter_name(pdf_file)}")
+        return True
+    
+    def _merge_with_qpdf(self, pdf_files, output_path):
+        """Concatenate PDFs with the qpdf CLI if installed, return success"""
+        qpdf = shutil.which('qpdf')
+        if not qpdf:
+            return False
+        
+        try:
+            result = subprocess.run(
+                [qpdf, '--empty', '--pages', *pdf_files, '--', output_path],
+                capture_output=True,
+                text=True,
+                timeout=_QPDF_TIMEOUT
+            )
+        except OSError as e:
+            self.logger.warning(f"⚠️ qpdf could not be started, merging with pypdf: {e}")
+            return False
+        except subprocess.TimeoutExpired:
+            self.logger.warning(f"⚠️ qpdf did not finish in {_QPDF_TIMEOUT}s, merging with pypdf")
+            return False
+        
+        # Exit status 3 means qpdf succeeded but reported warnings
+        if result.returncode not in (0, 3):
+            self.logger.warning(f"⚠️ qpdf failed, merging with pypdf: {result.stderr.strip()}")
+            return False
+        
+        self.logger.info(f"📄 Merged {len(pdf_files)} PDFs with qpdf")
+        return True
+    
+    def _append_sheet(self, writer, pdf_file, reader_future, add_bookmarks, page_offset):
+        """Append one prefetched sheet PDF at page_offset, return its page count
+        
+        A sheet that cannot be read is skipped and counts as 0 pages.
+        """
+        chapter_name = self._extract_chapter_name(pdf_file)
+        
+        try:
+            reader, num_pages = reader_future.result()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Skipping unreadable PDF {pdf_file}: {e}")
+            return 0
+        
+        # Copy pages only: sheet PDFs have no outlines, forms or named
+        # destinations for a full document import to bring along
+        writer.append_pages_from_reader(reader)
+        
+        if add_bookmarks:
+            writer.add_outline_item(chapter_name, page_offset)
+        self.logger.info(f"📄 Added: {chapter_name}")
+        return num_pages
+    
     def _extract_chapter_name(self, pdf_file):
         """Extract chapter name from PDF filename"""
         filename = os.path.basename(pdf_file)
@@ -75,16 +191,17 @@ class BusinessPDFMerger:
             return None
         
         try:
-            from PyPDF2 import PdfReader
-            
-            reader = PdfReader(ebook_path)
+            num_pages = self._page_counts.get(ebook_path)
+            if num_pages is None:
+                from pypdf import PdfReader
+                num_pages = len(PdfReader(ebook_path).pages)
             file_size = os.path.getsize(ebook_path)
             
             return {
                 'file_path': ebook_path,
                 'file_size_kb': round(file_size / 1024, 2),
                 'file_size_mb': round(file_size / (1024 * 1024), 2),
-                'num_pages': len(reader.pages),
+                'num_pages': num_pages,
                 'title': 'Vietnamese Business Ebook'
             }
         except Exception:
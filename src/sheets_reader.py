@@ -5,18 +5,25 @@ Google Sheets Reader - WITH RETRY LOGIC
 """
 
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
 from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 import logging
-import time
-import random
+import threading
+
+# execute() retries 429, 5xx and connection errors itself, sleeping with
+# randomized exponential backoff between attempts
+_NUM_RETRIES = 5
 
 class SheetsReader:
     """Google Sheets API reader với retry logic"""
 
     def __init__(self, credentials_path):
         self.credentials_path = credentials_path
+        self.credentials = None
         self.service = None
         self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
         self._initialize_service()
 
     def _initialize_service(self):
@@ -27,7 +34,8 @@ class SheetsReader:
                 scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
             )
 
-            self.service = build('sheets', 'v4', credentials=credentials)
+            self.credentials = credentials
+            self.service = build('sheets', 'v4', http=self._get_http(), cache_discovery=False)
 
             # Get service account email for logging
             service_account_email = credentials.service_account_email
@@ -45,7 +53,7 @@ class SheetsReader:
 
             spreadsheet = self.service.spreadsheets().get(
                 spreadsheetId=spreadsheet_id
-            ).execute()
+            ).execute(http=self._get_http(), num_retries=_NUM_RETRIES)
 
             title = spreadsheet.get('properties', {}).get('title', 'Unknown')
             sheets = spreadsheet.get('sheets', [])
@@ -72,43 +80,81 @@ class SheetsReader:
 
     def read_column_d(self, spreadsheet_id, sheet_name):
         """Read column D với retry logic"""
-        max_retries = 3
+        try:
+            self.logger.info(f"📖 Reading '{sheet_name}' Column D...")
 
-        for attempt in range(max_retries):
-            try:
-                self.logger.info(f"📖 Reading '{sheet_name}' Column D...")
+            range_name = self._column_range(sheet_name, 'D')
+            result = self.service.spreadsheets().values().get(
+                spreadsheetId=spreadsheet_id,
+                range=range_name
+            ).execute(http=self._get_http(), num_retries=_NUM_RETRIES)
 
-                # Add random delay to avoid rate limiting
-                if attempt > 0:
-                    delay = random.uniform(1, 3) + (attempt * 2)
-                    self.logger.info(f"⏳ Retry {attempt}, waiting {delay:.1f}s...")
-                    time.sleep(delay)
+            content_blocks = self._extract_column_values(result.get('values', []))
 
-                range_name = f"'{sheet_name}'!D:D"
-                result = self.service.spreadsheets().values().get(
-                    spreadsheetId=spreadsheet_id,
-                    range=range_name
-                ).execute()
+            if content_blocks:
+                self.logger.info(f"✅ Retrieved {len(content_blocks)} content blocks from '{sheet_name}'")
+                return content_blocks
+            else:
+                self.logger.warning(f"⚠️ No content found in '{sheet_name}' Column D")
+                return []
+
+        except Exception as e:
+            self.logger.error(f"❌ Failed to read '{sheet_name}': {str(e)}")
+            return []
 
-                values = result.get('values', [])
-                content_blocks = [row[0] for row in values if row and len(row) > 0 and row[0].strip()]
+    def batch_get_columns(self, spreadsheet_id, sheet_names, column='D'):
+        """Read one column from many sheets with a single batchGet request"""
+        if not sheet_names:
+            return {}
 
+        ranges = [self._column_range(sheet_name, column) for sheet_name in sheet_names]
+
+        try:
+            self.logger.info(f"📖 Reading Column {column} from {len(sheet_names)} sheets...")
+
+            result = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=ranges,
+                majorDimension='ROWS'
+            ).execute(http=self._get_http(), num_retries=_NUM_RETRIES)
+
+            # valueRanges come back in the same order as the requested ranges
+            columns = {}
+            for sheet_name, value_range in zip(sheet_names, result.get('valueRanges', [])):
+                content_blocks = self._extract_column_values(value_range.get('values', []))
                 if content_blocks:
                     self.logger.info(f"✅ Retrieved {len(content_blocks)} content blocks from '{sheet_name}'")
-                    return content_blocks
                 else:
-                    self.logger.warning(f"⚠️ No content found in '{sheet_name}' Column D")
-                    return []
+                    self.logger.warning(f"⚠️ No content found in '{sheet_name}' Column {column}")
+                columns[sheet_name] = content_blocks
 
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    self.logger.error(f"❌ Failed to read '{sheet_name}': {str(e)}")
-                    return []
-                else:
-                    self.logger.warning(f"⚠️ Attempt {attempt + 1} failed for '{sheet_name}': {str(e)}")
-                    continue
+            return columns
 
-        return []
+        except Exception as e:
+            self.logger.error(f"❌ Failed to batch read {len(sheet_names)} sheets: {str(e)}")
+            return {}
+
+    def _get_http(self):
+        """Authorized HTTP transport for the calling thread
+
+        httplib2.Http is not thread-safe, so each thread gets its own
+        instance and keeps reusing it (and its open TLS connection).
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=build_http())
+            self._local.http = http
+        return http
+
+    def _column_range(self, sheet_name, column):
+        """Build an A1 range for a whole column, quoting the sheet name"""
+        escaped_name = sheet_name.replace("'", "''")
+        return f"'{escaped_name}'!{column}:{column}"
+
+    def _extract_column_values(self, values):
+        """Keep the first cell of every non-blank row"""
+        # isspace() checks for blank cells without building a stripped copy
+        return [row[0] for row in values if row and row[0] and not row[0].isspace()]
 
 if __name__ == '__main__':
     print("🧪 Testing Sheets Reader with retry logic...")
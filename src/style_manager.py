@@ -5,102 +5,188 @@ Business Style Manager - FIXED VERSION
 Professional business book styling với Vietnamese font support
 """
 
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT
-from reportlab.lib.colors import HexColor
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.fonts import addMapping
+import functools
 import logging
 import os
+import threading
+
+# Vietnamese-capable fonts, in order of preference
+_FONT_CANDIDATES = [
+    # Windows fonts that support Vietnamese
+    ('C:/Windows/Fonts/arial.ttf', 'Arial'),
+    ('C:/Windows/Fonts/calibri.ttf', 'Calibri'),
+    ('C:/Windows/Fonts/DejaVuSans.ttf', 'DejaVu'),
+    # Linux fonts
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 'DejaVu'),
+    ('/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf', 'Liberation'),
+]
+
+# Style variants as (name, bold, italic), with the file name suffixes they
+# use in Windows (arialbd.ttf, calibriz.ttf) and Linux (DejaVuSans-Oblique.ttf)
+_FONT_VARIANTS = (
+    ('Bold', 1, 0, ('b', 'bd', '-Bold')),
+    ('Italic', 0, 1, ('i', '-Italic', '-Oblique')),
+    ('BoldItalic', 1, 1, ('bi', 'z', '-BoldItalic', '-BoldOblique')),
+)
+
+def _variant_paths(font_path, variant, suffixes):
+    """Candidate file paths for a style variant of a regular font file"""
+    stem, ext = os.path.splitext(font_path)
+    paths = [f'{stem}{suffix}{ext}' for suffix in suffixes]
+    if 'Regular' in stem:
+        paths.append(font_path.replace('Regular', variant))  # LiberationSans-Bold.ttf
+    return paths
+
+@functools.lru_cache(maxsize=None)
+def _list_font_dir(directory):
+    """Names of the files in a font directory, listed with one scandir"""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(os.path.normcase(entry.name) for entry in entries)
+    except OSError:
+        return frozenset()
+
+def _font_exists(font_path):
+    """Check a font path against its cached directory listing"""
+    directory, name = os.path.split(font_path)
+    return os.path.normcase(name) in _list_font_dir(directory)
+
+@functools.lru_cache(maxsize=1)
+def _discover_fonts():
+    """Probe the filesystem once for installed candidate fonts
+    
+    Returns a tuple of (font_name, font_path, variant_paths) for every
+    candidate that exists, keeping the preference order. variant_paths
+    maps each variant name to the existing files for it.
+    """
+    found = []
+    for font_path, font_name in _FONT_CANDIDATES:
+        if _font_exists(font_path):
+            variant_paths = {
+                variant: tuple(p for p in _variant_paths(font_path, variant, suffixes) if _font_exists(p))
+                for variant, _, _, suffixes in _FONT_VARIANTS
+            }
+            found.append((font_name, font_path, variant_paths))
+    return tuple(found)
+
+@functools.lru_cache(maxsize=1)
+def _discover_and_register_fonts():
+    """Register the preferred Vietnamese font once per process
+    
+    ReportLab's font table is global, so every style manager shares the
+    result. Returns (base_font, bold_registered).
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.lib.fonts import addMapping
+    
+    logger = logging.getLogger(__name__)
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    
+    for font_name, font_path, variant_paths in _discover_fonts():
+        try:
+            if font_name not in registered:
+                pdfmetrics.registerFont(TTFont(font_name, font_path))
+            
+            # Try to register each style variant from its first loadable file
+            faces = {(0, 0): font_name}
+            for variant, bold, italic, _ in _FONT_VARIANTS:
+                face_name = f'{font_name}-{variant}'
+                if face_name not in registered:
+                    for path in variant_paths[variant]:
+                        try:
+                            pdfmetrics.registerFont(TTFont(face_name, path))
+                            registered.add(face_name)
+                            break
+                        except Exception:
+                            continue
+                if face_name in registered:
+                    faces[bold, italic] = face_name
+            
+            # Map all four <b>/<i> combinations, using the nearest registered
+            # face for missing ones so inline markup never hits an unmapped font
+            for bold in (0, 1):
+                for italic in (0, 1):
+                    face_name = (faces.get((bold, italic)) or faces.get((bold, 0))
+                                 or faces.get((0, italic)) or font_name)
+                    addMapping(font_name, bold, italic, face_name)
+            
+            logger.info(f"✅ Registered Vietnamese font: {font_name}")
+            return font_name, (1, 0) in faces
+            
+        except Exception as e:
+            logger.debug("Failed to register %s: %s", font_name, e)
+            continue
+    
+    # Fallback to Helvetica with warning
+    logger.warning("⚠️ No Vietnamese fonts found, using Helvetica")
+    logger.info("💡 Install Arial or Calibri for better Vietnamese support")
+    return 'Helvetica', True
+
+def _copy_style_sheet(styles):
+    """Shallow copy of a StyleSheet1, sharing its (read-only) styles"""
+    from reportlab.lib.styles import StyleSheet1
+    
+    copied = StyleSheet1()
+    copied.byName.update(styles.byName)
+    copied.byAlias.update(styles.byAlias)
+    return copied
 
 class BusinessStyleManager:
     """Professional business book styles with Vietnamese support"""
     
+    # Finished style sheets keyed by base font, shared by all instances
+    _style_cache = {}
+    _style_lock = threading.Lock()
+    
     def __init__(self):
+        from reportlab.lib.styles import getSampleStyleSheet
+        
         self.logger = logging.getLogger(__name__)
-        self.styles = getSampleStyleSheet()
-        self.base_font = self._register_vietnamese_fonts()
-        self._create_business_styles()
-    
-    def _register_vietnamese_fonts(self):
-        """Register Vietnamese-compatible fonts"""
-        # Windows fonts that support Vietnamese  
-        font_paths = [
-            ('C:/Windows/Fonts/arial.ttf', 'Arial'),
-            ('C:/Windows/Fonts/calibri.ttf', 'Calibri'),
-            ('C:/Windows/Fonts/DejaVuSans.ttf', 'DejaVu'),
-            # Linux fonts
-            ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 'DejaVu'),
-            ('/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf', 'Liberation'),
-        ]
+        self.base_font, self.bold_registered = _discover_and_register_fonts()
         
-        for font_path, font_name in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    pdfmetrics.registerFont(TTFont(font_name, font_path))
-                    
-                    # Try to register bold variant
-                    bold_variants = [
-                        font_path.replace('.ttf', 'b.ttf'),  # arialb.ttf  
-                        font_path.replace('.ttf', '-Bold.ttf'),
-                        font_path.replace('Regular', 'Bold'),
-                        font_path.replace('arial.ttf', 'arialbd.ttf'),  # Windows Arial Bold
-                        font_path.replace('calibri.ttf', 'calibrib.ttf'),  # Windows Calibri Bold
-                    ]
-                    
-                    bold_registered = False
-                    for bold_path in bold_variants:
-                        if os.path.exists(bold_path):
-                            try:
-                                pdfmetrics.registerFont(TTFont(f'{font_name}-Bold', bold_path))
-                                bold_registered = True
-                                break
-                            except:
-                                continue
-                    
-                    # Register font mappings
-                    addMapping(font_name, 0, 0, font_name)
-                    if bold_registered:
-                        addMapping(font_name, 1, 0, f'{font_name}-Bold')
-                    
-                    self.logger.info(f"✅ Registered Vietnamese font: {font_name}")
-                    return font_name
-                    
-                except Exception as e:
-                    self.logger.debug(f"Failed to register {font_name}: {e}")
-                    continue
+        # StyleSheet1 is not safe to mutate from several threads, so the
+        # first instance per font builds it under the lock
+        with self._style_lock:
+            cached = self._style_cache.get(self.base_font)
+            if cached is None:
+                self.styles = getSampleStyleSheet()
+                self._create_business_styles()
+                cached = self._style_cache[self.base_font] = self.styles
         
-        # Fallback to Helvetica with warning
-        self.logger.warning("⚠️ No Vietnamese fonts found, using Helvetica")
-        self.logger.info("💡 Install Arial or Calibri for better Vietnamese support")
-        return 'Helvetica'
+        # Each instance gets its own name table, so adding styles to it
+        # does not leak into the shared sheet
+        self.styles = _copy_style_sheet(cached)
     
     def _create_business_styles(self):
         """Create business book paragraph styles"""
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT
+        from reportlab.lib.colors import HexColor
+        from reportlab.lib.units import inch
 
-        bold_font = f'{self.base_font}-Bold' if self.base_font != 'Helvetica' else 'Helvetica-Bold'
+        # Without a registered bold face, headings fall back to the regular one
+        bold_font = f'{self.base_font}-Bold' if self.bold_registered else self.base_font
 
-        # CHAPTER TITLE
+        # CHAPTER TITLE (spacing below the title is part of the style)
         self.styles.add(ParagraphStyle(
             name='BusinessChapter',
             fontSize=24,
             textColor=HexColor('#1a1a1a'),
-            spaceAfter=24,
+            spaceAfter=24 + 0.2*inch,
             spaceBefore=12,
             alignment=TA_LEFT,
             fontName=bold_font,
             leading=30
         ))
 
-        # BODY TEXT
+        # BODY TEXT (paragraph gap lives in spaceAfter, no Spacer flowables)
         self.styles.add(ParagraphStyle(
             name='BusinessBody',
             fontSize=12,
             leading=16,
             alignment=TA_JUSTIFY,
-            spaceAfter=8,
+            spaceAfter=8 + 0.05*inch,
             spaceBefore=0,
             firstLineIndent=0,
             fontName=self.base_font,
@@ -2,64 +2,230 @@
 # -*- coding: utf-8 -*-
 """
 Thread Manager
-Handle multi-threaded processing of Google Sheets
+Handle parallel processing of Google Sheets
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import functools
 import logging
+import math
+import multiprocessing
+import os
+import queue
+import threading
 import time
 
 class ThreadManager:
     """Manage parallel processing of multiple sheets"""
     
-    def __init__(self, max_workers=None):
+    def __init__(self, max_workers=None, cpu_workers=None):
+        # Threads only wait on the network, so their count is bounded by the
+        # Sheets API quota (60 read requests per minute per user), not by CPUs
         if max_workers is None:
-            import os
-            max_workers = min(os.cpu_count() or 4, 6)
+            max_workers = 16
+        
+        # Rendering processes each keep a core busy
+        if cpu_workers is None:
+            cpu_workers = min(os.cpu_count() or 4, 6)
         
         self.max_workers = max_workers
+        self.cpu_workers = cpu_workers
         self.logger = logging.getLogger(__name__)
     
-    def process_sheets_parallel(self, sheets, processor_func, *args, **kwargs):
-        """Process multiple sheets in parallel"""
+    def process_sheets_parallel(self, sheets, processor_func, *args, deadline_seconds=None, **kwargs):
+        """Process multiple sheets in parallel threads
+        
+        For I/O-bound work such as Sheets API reads, which release the GIL
+        while waiting on the network. With deadline_seconds, sheets that have
+        not finished by then are abandoned and left out of the results.
+        
+        Results are returned in the order of sheets, whatever order the
+        threads finish in.
+        """
+        if not sheets:
+            return {}
+        
+        sheets = list(sheets)
+        outcomes = [None] * len(sheets)
+        start_time = time.time()
+        deadline = None if deadline_seconds is None else start_time + deadline_seconds
+        
+        task_queue = queue.Queue()
+        for task in enumerate(sheets):
+            task_queue.put(task)
+        done_queue = queue.Queue()
+        stop = threading.Event()
+        
+        # Daemon threads rather than a ThreadPoolExecutor, whose threads are
+        # joined at interpreter exit: a call abandoned at the deadline must
+        # not keep the process alive until it times out on its own
+        for _ in range(min(self.max_workers, len(sheets))):
+            threading.Thread(
+                target=_run_io_tasks,
+                args=(task_queue, done_queue, stop, processor_func, args, kwargs),
+                daemon=True
+            ).start()
+        
+        pending = set(range(len(sheets)))
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0, deadline - time.time())
+                try:
+                    index, result, error = done_queue.get(timeout=timeout)
+                except queue.Empty:
+                    unfinished = [sheets[i] for i in sorted(pending)]
+                    self.logger.error(f"⏰ Deadline of {deadline_seconds}s reached, abandoning: {', '.join(unfinished)}")
+                    break
+                
+                pending.discard(index)
+                sheet_name = sheets[index]
+                if error:
+                    self.logger.error(f"❌ Failed {sheet_name}: {error}")
+                elif result:
+                    outcomes[index] = result
+                    self.logger.info(f"✅ Completed: {sheet_name}")
+                else:
+                    self.logger.warning(f"⚠️ No result for: {sheet_name}")
+        finally:
+            # Idle threads stop picking up queued sheets
+            stop.set()
+        
+        total_time = time.time() - start_time
+        self.logger.info(f"🏁 Processing completed in {total_time:.1f} seconds")
+        
+        return {sheet: result for sheet, result in zip(sheets, outcomes) if result}
+    
+    def process_sheets_cpu_parallel(self, sheets, processor_func, *args, **kwargs):
+        """Process multiple sheets in parallel worker processes
+        
+        ReportLab layout is CPU-bound and holds the GIL, so sheets are built
+        in separate processes. processor_func must be a module-level function
+        and all arguments must be picklable.
+        
+        sheets is either a list of sheet names or a dict mapping each sheet
+        name to pre-fetched data, which is passed right after the name.
+        """
         if not sheets:
             return {}
         
+        if isinstance(sheets, dict):
+            sheet_items = [(sheet, (data,)) for sheet, data in sheets.items()]
+        else:
+            sheet_items = [(sheet, ()) for sheet in sheets]
+        
+        task = functools.partial(_run_sheet_task, processor_func, args, kwargs)
         results = {}
         start_time = time.time()
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_sheet = {
-                executor.submit(processor_func, sheet, *args, **kwargs): sheet
-                for sheet in sheets
-            }
+        with ProcessPoolExecutor(
+            max_workers=self.cpu_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(logging.getLogger().getEffectiveLevel(),)
+        ) as executor:
+            # Send several sheets per IPC round-trip when there are many of
+            # them, while still leaving ~4 chunks per worker for balancing
+            chunksize = max(1, len(sheet_items) // (4 * self.cpu_workers))
             
-            for future in as_completed(future_to_sheet):
-                sheet_name = future_to_sheet[future]
-                try:
-                    result = future.result(timeout=300)
-                    if result:
+            # map yields in submission order, so results follow the sheet order
+            outcomes = executor.map(task, sheet_items, chunksize=chunksize)
+            finished = 0
+            
+            try:
+                for (sheet_name, _), (result, error) in zip(sheet_items, outcomes):
+                    finished += 1
+                    if error:
+                        self.logger.error(f"❌ Failed {sheet_name}: {error}")
+                    elif result:
                         results[sheet_name] = result
                         self.logger.info(f"✅ Completed: {sheet_name}")
                     else:
                         self.logger.warning(f"⚠️ No result for: {sheet_name}")
-                except Exception as e:
-                    self.logger.error(f"❌ Failed {sheet_name}: {str(e)}")
+            except BrokenProcessPool as e:
+                # A worker died outright (e.g. killed for memory), which fails
+                # every outstanding task; keep the sheets that already finished
+                unfinished = [sheet_name for sheet_name, _ in sheet_items[finished:]]
+                self.logger.error(f"❌ Worker process died ({e}), not rendered: {', '.join(unfinished)}")
         
         total_time = time.time() - start_time
         self.logger.info(f"🏁 Processing completed in {total_time:.1f} seconds")
         
         return results
+    
+    def estimate_processing_time(self, num_sheets, avg_time_per_sheet=8):
+        """Estimate wall time for processing sheets in parallel"""
+        workers = max(1, min(self.cpu_workers, num_sheets))
+        estimate = math.ceil(num_sheets / workers) * avg_time_per_sheet
+        
+        return {
+            'estimate_seconds': estimate,
+            'parallel_speedup': round(num_sheets * avg_time_per_sheet / estimate, 1)
+        }
+
+def _init_worker(log_level):
+    """Configure logging in a freshly spawned worker process"""
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    logging.getLogger('googleapiclient').setLevel(logging.WARNING)
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+def _run_io_tasks(task_queue, done_queue, stop, processor_func, args, kwargs):
+    """Worker thread loop: run queued (index, sheet) tasks until none are left
+    
+    Each outcome is reported as (index, result, error) on done_queue.
+    """
+    while not stop.is_set():
+        try:
+            index, sheet = task_queue.get_nowait()
+        except queue.Empty:
+            return
+        
+        try:
+            done_queue.put((index, processor_func(sheet, *args, **kwargs), None))
+        except Exception as e:
+            done_queue.put((index, None, str(e)))
 
-def process_single_sheet(sheet_name, spreadsheet_id, sheets_reader, content_processor, pdf_generator):
-    """Process a single sheet - designed for threading"""
+def _run_sheet_task(processor_func, args, kwargs, sheet_item):
+    """Run processor_func for one sheet inside a worker process
+    
+    Returns (result, error) instead of raising so that one failing sheet
+    does not abort the executor.map iteration for the others.
+    """
+    sheet, data = sheet_item
+    try:
+        return processor_func(sheet, *data, *args, **kwargs), None
+    except Exception as e:
+        return None, str(e)
+
+@functools.lru_cache(maxsize=None)
+def _get_worker_components(output_dir):
+    """Build the processing pipeline once per worker process
+    
+    ReportLab styles and fonts cannot cross the pickle boundary, so each
+    process creates its own instances.
+    """
+    from .content_processor import ContentProcessor
+    from .style_manager import BusinessStyleManager
+    from .pdf_generator import BusinessPDFGenerator
+    
+    content_processor = ContentProcessor()
+    pdf_generator = BusinessPDFGenerator(BusinessStyleManager(), output_dir=output_dir)
+    return content_processor, pdf_generator
+
+def process_single_sheet(sheet_name, raw_content, output_dir):
+    """Process a single sheet's pre-fetched rows - designed for worker processes"""
     logger = logging.getLogger(__name__)
     
     try:
-        raw_content = sheets_reader.read_column_d(spreadsheet_id, sheet_name)
         if not raw_content:
             return None
         
+        content_processor, pdf_generator = _get_worker_components(output_dir)
+        
         content_blocks = content_processor.process_sheet_content(raw_content)
         if not content_blocks:
             return None